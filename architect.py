@@ -8,20 +8,37 @@ Usage:
     python architect.py runs/1 --process cdd-individuals          # Single process
     python architect.py runs/1 --dry-run                          # Print prompts only
     python architect.py runs/1 --model claude-sonnet-4-5-20250929 # Override model
+    python architect.py runs/1 --review-only-problematic          # Review only forms the audit flagged
+    python architect.py runs/1 --batch                            # Message Batches API (unattended)
+    python architect.py runs/1 --force                            # Regenerate up-to-date forms too
+    python architect.py runs/1 --concurrency 10                   # More API calls in flight
+    python architect.py runs/1 --no-cache                         # Bypass the on-disk response cache
 """
 
 import argparse
+import asyncio
+import functools
+import hashlib
+import itertools
 import json
 import logging
 import os
 import re
 import sys
-import time
-from collections import defaultdict
+import tempfile
+from collections import Counter
+from typing import TYPE_CHECKING, TypedDict
 
-import anthropic
 from dotenv import load_dotenv
 
+try:
+    import orjson  # optional: faster JSON reads and writes
+except ImportError:
+    orjson = None
+
+if TYPE_CHECKING:
+    import anthropic  # imported at run time only when API calls are made (~1s import)
+
 load_dotenv()
 
 logging.basicConfig(
@@ -35,8 +52,9 @@ logger = logging.getLogger(__name__)
 # Constants
 # ---------------------------------------------------------------------------
 
-ID_REGEX = re.compile(r"^4(_\d+)+(_[a-z])?$")
-SLUG_REGEX = re.compile(r"^[a-z][a-z0-9-]*$")
+# Use with .fullmatch(); IDs and slugs are ASCII-only, so \d means [0-9]
+ID_REGEX = re.compile(r"4(_\d+)+(_[a-z])?", re.ASCII)
+SLUG_REGEX = re.compile(r"[a-z][a-z0-9-]*", re.ASCII)
 
 FEEDBACK_DIR = "feedback"
 
@@ -57,7 +75,37 @@ PROCESSES = {
 
 MODEL_SMALL = "claude-haiku-4-5-20251001"
 MODEL_LARGE = "claude-sonnet-4-5-20250929"
-TEXT_NODE_THRESHOLD = 50  # groups with >= this many nodes use the large model
+ROUTE_TOKEN_THRESHOLD = 1600  # forms with >= this many estimated regulatory-text tokens use the large model
+MAX_CONCURRENCY = 5  # process-form API calls in flight at once (Anthropic RPM headroom)
+BATCH_POLL_INTERVAL = 30  # seconds between Message Batch status checks in --batch mode
+API_RPM = 50  # requests per minute shared by process and review calls (Anthropic tier-1 limit)
+API_TPM = 400_000  # estimated input tokens per minute shared by process and review calls
+API_MAX_RETRIES = 6  # SDK retries 429/529/5xx/connection errors with jittered backoff, honouring retry-after
+API_TIMEOUT = 120.0  # seconds per HTTP read; streamed calls reset it on every chunk, so it bounds stalls, not long outputs
+REVIEW_MAX_TOKENS = 16_000  # ceiling on a review's output budget, and the budget a truncated review is retried at
+LLM_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "architect")  # tool inputs keyed by request hash
+
+
+class TextNode(TypedDict):
+    """A regulatory text node as written to groups_enriched.json by main.py."""
+    node_index: int
+    text: str
+    rule_code: str
+    type: str
+    is_bold: bool
+    is_italic: bool
+
+
+# Prompt suffix for a text node, keyed on (is_bold, is_italic) — bold wins over italic
+NODE_STYLE_SUFFIX = {
+    (True, True): " **BOLD**",
+    (True, False): " **BOLD**",
+    (False, True): " *ITALIC/NOTE*",
+    (False, False): "",
+}
+
+# Anthropic prompt-cache marker for static prefixes (system prompt, tool schemas)
+EPHEMERAL_CACHE = {"type": "ephemeral"}
 
 # ---------------------------------------------------------------------------
 # Process forms map — one form per business process step
@@ -336,7 +384,10 @@ OUTPUT_TOOL = {
 # System prompt
 # ---------------------------------------------------------------------------
 
-PROCESS_SYSTEM_PROMPT = f"""You are a compliance **process** architect. Your job is to analyse Australian AML/CTF regulatory text and produce structured form data organized by **business process step**, not by regulation sub-section.
+@functools.lru_cache(maxsize=None)
+def get_process_system_prompt() -> str:
+    """Build the process system prompt on first use rather than at import."""
+    return f"""You are a compliance **process** architect. Your job is to analyse Australian AML/CTF regulatory text and produce structured form data organized by **business process step**, not by regulation sub-section.
 
 ## Output Types
 
@@ -412,7 +463,7 @@ Group IDs MUST match: ^[a-z][a-z0-9-]*$
 
 ## Process IDs
 
-{json.dumps(PROCESSES, indent=2)}
+{json.dumps(PROCESSES, separators=(",", ":"))}
 """
 
 
@@ -422,8 +473,7 @@ def load_feedback(run_dir: str, process_id: str) -> dict | None:
     if not os.path.exists(feedback_path):
         return None
     try:
-        with open(feedback_path) as f:
-            data = json.load(f)
+        data = load_json(feedback_path)
         logger.info(f"  Loaded feedback for {process_id} (last_updated: {data.get('last_updated', 'unknown')})")
         return data
     except Exception as e:
@@ -466,8 +516,8 @@ def apply_feedback_overrides(result: dict, feedback: dict) -> dict:
     control_overrides = feedback.get("control_overrides", {})
     if control_overrides:
         for ctrl in result.get("controls", []):
-            if ctrl["id"] in control_overrides:
-                overrides = control_overrides[ctrl["id"]]
+            overrides = control_overrides.get(ctrl["id"])
+            if overrides is not None:
                 ctrl.update(overrides)
                 logger.info(f"  Applied override for control {ctrl['id']}: {list(overrides.keys())}")
 
@@ -486,32 +536,42 @@ def apply_feedback_overrides(result: dict, feedback: dict) -> dict:
     return result
 
 
-def gather_process_nodes(process_id: str, groups: list[dict]) -> list[dict]:
-    """Gather all text nodes for a process form from its source groups."""
-    form_def = PROCESS_FORMS[process_id]
-    group_map = {g["id"]: g for g in groups}
-    all_nodes = []
+def gather_process_nodes(process_id: str, group_map: dict[str, dict]) -> list[TextNode]:
+    """Gather all text nodes for a process form from its source groups (group_map: id → group).
 
-    for prefix in form_def["source_groups"]:
-        if prefix in group_map:
-            nodes = group_map[prefix].get("text_nodes", [])
-            all_nodes.extend(nodes)
+    Nodes are de-duplicated by node_index (first occurrence wins), so overlapping
+    source groups — e.g. a parent group and one of its children — never send the
+    same regulatory text twice.
+    """
+    nodes = itertools.chain.from_iterable(
+        group_map[prefix].get("text_nodes", [])
+        for prefix in PROCESS_FORMS[process_id]["source_groups"]
+        if prefix in group_map
+    )
+    return list({tn["node_index"]: tn for tn in nodes}.values())
 
-    return all_nodes
 
+def estimate_text_tokens(text_nodes: list[TextNode]) -> int:
+    """Rough token count of a form's regulatory text (~4 chars per token)."""
+    return sum(len(tn["text"]) for tn in text_nodes) // 4
 
-def build_process_user_message(process_id: str, form_def: dict, text_nodes: list[dict], feedback: dict | None = None) -> str:
-    """Build the user message for a process-mode LLM call."""
-    # Format text nodes
-    nodes_text = ""
-    for tn in text_nodes:
-        prefix = f"[{tn['rule_code']}] " if tn["rule_code"] else ""
-        style = ""
-        if tn["is_bold"]:
-            style = " **BOLD**"
-        elif tn["is_italic"]:
-            style = " *ITALIC/NOTE*"
-        nodes_text += f"  {prefix}{tn['text']}{style}\n"
+
+def select_model(text_tokens: int, threshold: int = ROUTE_TOKEN_THRESHOLD) -> str:
+    """Route forms with a lot of regulatory text to the large model, the rest to the small one.
+
+    The system prompt is the same for every form, so only the text is counted.
+    """
+    return MODEL_LARGE if text_tokens >= threshold else MODEL_SMALL
+
+
+@functools.lru_cache(maxsize=None)
+def build_process_static_block(process_id: str) -> str:
+    """Build the static head of a process user message.
+
+    Depends only on the constant PROCESS_FORMS entry, so it is built (and its
+    sub-type / subprocess JSON serialised) once per process id.
+    """
+    form_def = PROCESS_FORMS[process_id]
 
     # Gating context
     gating_section = ""
@@ -566,14 +626,26 @@ The following sub-processes are handled via links to separate forms. Do NOT gene
 {notes_lines}
 """
 
+    return f"""## Process Form: {form_def['title']}
+Process ID: {process_id}
+{gating_section}{sub_types_section}{subprocess_section}{form_links_section}{notes_section}"""
+
+
+def build_process_dynamic_block(form_def: dict, text_nodes: list[TextNode], feedback: dict | None = None) -> str:
+    """Build the dynamic tail of a process user message: SME feedback and regulatory text."""
+    # Format text nodes (one join instead of repeated string concatenation)
+    nodes_text = "".join([
+        f"  {'[' + tn['rule_code'] + '] ' if tn['rule_code'] else ''}{tn['text']}"
+        f"{NODE_STYLE_SUFFIX[tn['is_bold'], tn['is_italic']]}\n"
+        for tn in text_nodes
+    ])
+
     # SME feedback section (injected after architect notes, before regulatory text)
     feedback_section = ""
     if feedback:
         feedback_section = build_feedback_prompt_section(feedback)
 
-    return f"""## Process Form: {form_def['title']}
-Process ID: {process_id}
-{gating_section}{sub_types_section}{subprocess_section}{form_links_section}{notes_section}{feedback_section}
+    return f"""{feedback_section}
 ## Regulatory Text ({len(text_nodes)} text nodes)
 {nodes_text}
 Analyse the regulatory text above and produce the controls, groups, and rules for the "{form_def['title']}" process form. Remember:
@@ -583,32 +655,33 @@ Analyse the regulatory text above and produce the controls, groups, and rules fo
 """
 
 
+def build_process_user_message(process_id: str, form_def: dict, text_nodes: list[TextNode], feedback: dict | None = None) -> str:
+    """Build the user message for a process-mode LLM call."""
+    return build_process_static_block(process_id) + build_process_dynamic_block(form_def, text_nodes, feedback)
+
+
 # ---------------------------------------------------------------------------
 # Coverage audit — post-processing diff of input vs output rule codes
 # ---------------------------------------------------------------------------
 
 
-def extract_input_rule_codes(text_nodes: list[dict]) -> set[str]:
+def extract_input_rule_codes(text_nodes: list[TextNode]) -> set[str]:
     """Extract unique rule codes from input text nodes."""
-    codes = set()
-    for tn in text_nodes:
-        code = tn.get("rule_code", "").strip()
-        if code and not code.startswith("Part "):
-            codes.add(code)
-    return codes
+    return {
+        code
+        for tn in text_nodes
+        if (code := tn["rule_code"].strip()) and not code.startswith("Part ")
+    }
 
 
 def extract_output_rule_codes(result: dict) -> set[str]:
     """Extract unique rule codes from output controls' source-rules."""
-    codes = set()
-    for ctrl in result.get("controls", []):
-        for code in ctrl.get("source-rules", []):
-            codes.add(code)
-    return codes
+    return {code for ctrl in result.get("controls", []) for code in ctrl.get("source-rules", [])}
 
 
-def compute_coverage_report(process_id: str, text_nodes: list[dict], result: dict) -> dict:
+def compute_coverage_report(process_id: str, text_nodes: list[TextNode], result: dict) -> dict:
     """Compare input rule codes against output source-rules to find coverage gaps."""
+    controls = result.get("controls", [])
     input_codes = extract_input_rule_codes(text_nodes)
     output_codes = extract_output_rule_codes(result)
 
@@ -619,7 +692,7 @@ def compute_coverage_report(process_id: str, text_nodes: list[dict], result: dic
     coverage_pct = (len(mapped) / len(input_codes) * 100) if input_codes else 100.0
 
     low_confidence = []
-    for ctrl in result.get("controls", []):
+    for ctrl in controls:
         conf = ctrl.get("mapping-confidence")
         if conf is not None and conf < 0.5:
             low_confidence.append({
@@ -639,11 +712,16 @@ def compute_coverage_report(process_id: str, text_nodes: list[dict], result: dic
         "total_input": len(input_codes),
         "total_mapped": len(mapped),
         "total_unmapped": len(unmapped),
-        "total_controls": len(result.get("controls", [])),
+        "total_controls": len(controls),
         "low_confidence": low_confidence,
     }
 
 
+def needs_review(report: dict) -> bool:
+    """True if the coverage audit flagged anything: unmapped rules, unknown source-rules or low-confidence controls."""
+    return bool(report["unmapped_codes"] or report["extra_codes"] or report["low_confidence"])
+
+
 def log_coverage_report(report: dict):
     """Log a coverage report summary."""
     pid = report["process_id"]
@@ -654,7 +732,7 @@ def log_coverage_report(report: dict):
 
     level = logging.INFO if pct >= 90 and unmapped == 0 else logging.WARNING
     logger.log(level,
-        f"  Coverage: {pct}% ({report['total_mapped']}/{report['total_input']} rules mapped)"
+        f"  {pid} coverage: {pct}% ({report['total_mapped']}/{report['total_input']} rules mapped)"
     )
     if unmapped > 0:
         logger.warning(f"  UNMAPPED ({unmapped}): {', '.join(report['unmapped_codes'])}")
@@ -666,48 +744,328 @@ def log_coverage_report(report: dict):
             logger.warning(f"    {lc['id']} (conf={lc['confidence']}): {lc['label']}")
 
 
-def call_process_architect(
-    client: anthropic.Anthropic,
+# ---------------------------------------------------------------------------
+# API calls — rate limiting, request building and response parsing
+# ---------------------------------------------------------------------------
+
+class TokenBucket:
+    """Async token bucket: refills per_minute units per minute and bursts up to that many."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self._tokens = per_minute
+        self._updated: float | None = None
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount: float = 1) -> None:
+        """Wait until amount units are available, then take them."""
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            while True:
+                # Re-clamp each pass: adjust() may shrink capacity while we sleep
+                need = min(amount, self.capacity)
+                now = loop.time()
+                if self._updated is not None:
+                    self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= need:
+                    self._tokens -= need
+                    return
+                await asyncio.sleep((need - self._tokens) / self.rate)
+
+    def adjust(self, limit: int | None, remaining: int | None) -> None:
+        """Resize to the per-minute limit the API reports and never hold more than it says remains."""
+        if limit:
+            self.capacity = limit
+            self.rate = limit / 60.0
+            self._tokens = min(self._tokens, limit)
+        if remaining is not None:
+            self._tokens = min(self._tokens, remaining)
+
+
+def header_int(headers, name: str) -> int | None:
+    """Read an integer response header, or None if it is missing or malformed."""
+    try:
+        return int(headers.get(name))
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimiter:
+    """One request/token budget shared by every API call in a run.
+
+    Starts from the configured API_RPM/API_TPM and is then steered by the
+    anthropic-ratelimit-* headers on each response, so it runs at the account's
+    real limits rather than the tier-1 defaults.
+    """
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+
+    async def acquire(self, estimated_tokens: int) -> None:
+        """Wait for one request slot and estimated_tokens of token budget."""
+        await self.requests.acquire()
+        await self.tokens.acquire(estimated_tokens)
+
+    def update(self, headers) -> None:
+        """Apply the request and input-token limits reported in a response's rate-limit headers."""
+        for bucket, kind in ((self.requests, "requests"), (self.tokens, "input-tokens")):
+            bucket.adjust(
+                header_int(headers, f"anthropic-ratelimit-{kind}-limit"),
+                header_int(headers, f"anthropic-ratelimit-{kind}-remaining"),
+            )
+
+
+def estimate_input_tokens(request: dict) -> int:
+    """Rough input-token estimate for a messages.create request (~4 chars per token)."""
+    return len(json.dumps([request.get("system"), request["messages"], request.get("tools")])) // 4
+
+
+def log_usage(label: str, usage, totals: Counter | None = None) -> None:
+    """Log token usage for an API call, including prompt-cache writes and reads, and add it to totals."""
+    cache_write = usage.cache_creation_input_tokens or 0
+    cache_read = usage.cache_read_input_tokens or 0
+    logger.info(
+        f"  {label}: {usage.input_tokens} input tokens "
+        f"(cache write {cache_write}, cache read {cache_read}), "
+        f"{usage.output_tokens} output tokens"
+    )
+    if totals is not None:
+        totals.update(
+            calls=1, input=usage.input_tokens, cache_write=cache_write,
+            cache_read=cache_read, output=usage.output_tokens,
+        )
+
+
+def log_usage_summary(totals: Counter) -> None:
+    """Log run-wide token totals and the share of prompt tokens served from the prompt cache."""
+    prompt_tokens = totals["input"] + totals["cache_write"] + totals["cache_read"]
+    cache_hit_pct = round(totals["cache_read"] / prompt_tokens * 100, 1) if prompt_tokens else 0.0
+    logger.info(
+        f"Token usage ({totals['calls']} calls): {prompt_tokens} prompt tokens — "
+        f"{totals['cache_read']} cache reads ({cache_hit_pct}%), {totals['cache_write']} cache writes, "
+        f"{totals['input']} uncached — and {totals['output']} output tokens"
+    )
+
+
+def build_process_request(process_id: str, form_def: dict, text_nodes: list[TextNode],
+                          model: str, feedback: dict | None = None) -> dict:
+    """Build the Messages API parameters for a process-form call."""
+    static_block = build_process_static_block(process_id)
+    dynamic_block = build_process_dynamic_block(form_def, text_nodes, feedback)
+
+    # System prompt and tool schema are identical across every process call,
+    # so mark them cacheable — calls after the first read them from the prefix cache.
+    # The form-definition head of the user message is a second breakpoint, so
+    # retries and re-runs of the same form also reuse it.
+    return {
+        "model": model,
+        "max_tokens": 8192,
+        "system": [{"type": "text", "text": get_process_system_prompt(), "cache_control": EPHEMERAL_CACHE}],
+        "messages": [{
+            "role": "user",
+            "content": [
+                {"type": "text", "text": static_block, "cache_control": EPHEMERAL_CACHE},
+                {"type": "text", "text": dynamic_block},
+            ],
+        }],
+        "tools": [{**OUTPUT_TOOL, "cache_control": EPHEMERAL_CACHE}],
+        "tool_choice": {"type": "tool", "name": "output_section_data"},
+    }
+
+
+def find_tool_input(response, tool_name: str):
+    """Return the input of the response's tool_use block for tool_name, or None if there is none."""
+    return next((b.input for b in response.content if b.type == "tool_use" and b.name == tool_name), None)
+
+
+class ResponseCache:
+    """On-disk cache of tool inputs, keyed by a hash of the full Messages API request.
+
+    The key covers model, prompts, tool schema and max_tokens, so any change to
+    what would be sent is a miss. With refresh=True lookups always miss but new
+    responses are still stored.
+    """
+
+    def __init__(self, cache_dir: str, refresh: bool = False):
+        self.cache_dir = cache_dir
+        self.refresh = refresh
+
+    def path(self, request: dict) -> str:
+        key = hashlib.sha256(json.dumps(request, sort_keys=True).encode()).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, request: dict):
+        """Cached tool input for request, or None on a miss (or an unreadable entry)."""
+        if self.refresh:
+            return None
+        try:
+            return load_json(self.path(request))
+        except (OSError, ValueError):
+            return None
+
+    def put(self, request: dict, data) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        write_json_atomic(self.path(request), data)
+
+
+def validate_process_output(process_id: str, data) -> dict | None:
+    """Shape-check, validate and strip a SectionData tool input."""
+    # Reject structurally malformed output before the item-level validators index into it
+    errors = check_output_shape(data)
+    if errors:
+        for e in errors:
+            logger.error(f"  {process_id}: {e}")
+        return None
+    stripped, warnings = validate_and_strip(data)
+    for w in warnings:
+        logger.warning(f"  {process_id}: {w}")
+    log_stripped_items(data, stripped)
+    return stripped
+
+
+def parse_process_response(process_id: str, response, usage_totals: Counter | None = None) -> dict | None:
+    """Extract, validate and strip the SectionData tool input from a process-call response."""
+    log_usage(process_id, response.usage, usage_totals)
+
+    # A response cut off at max_tokens carries a partial tool input — discard it rather than keep half a form
+    if response.stop_reason == "max_tokens":
+        logger.error(
+            f"Output for process {process_id} truncated at max_tokens "
+            f"({response.usage.output_tokens} output tokens) — discarding"
+        )
+        return None
+
+    data = find_tool_input(response, "output_section_data")
+    if data is None:
+        logger.error(f"No tool_use block in response for process {process_id}")
+        return None
+    return validate_process_output(process_id, data)
+
+
+async def call_process_architect(
+    client: "anthropic.AsyncAnthropic",
     process_id: str,
     form_def: dict,
-    text_nodes: list[dict],
+    text_nodes: list[TextNode],
     model: str,
     dry_run: bool = False,
     feedback: dict | None = None,
+    limiter: RateLimiter | None = None,
+    usage_totals: Counter | None = None,
+    cache: ResponseCache | None = None,
 ) -> dict | None:
     """Call the LLM for a process form and return parsed SectionData."""
-    user_msg = build_process_user_message(process_id, form_def, text_nodes, feedback)
-
     if dry_run:
+        user_msg = build_process_user_message(process_id, form_def, text_nodes, feedback)
         print(f"\n{'='*60}")
         print(f"DRY RUN — Process: {process_id} | Model: {model}")
         print(f"{'='*60}")
-        print(f"SYSTEM PROMPT: ({len(PROCESS_SYSTEM_PROMPT)} chars)")
+        print(f"SYSTEM PROMPT: ({len(get_process_system_prompt())} chars)")
         print(f"USER MESSAGE:\n{user_msg}")
         return None
 
+    request = build_process_request(process_id, form_def, text_nodes, model, feedback)
+    cached = cache.get(request) if cache is not None else None
+    if cached is not None:
+        logger.info(f"Using cached response for process {process_id}")
+        return validate_process_output(process_id, cached)
+
     logger.info(f"Calling API for process {process_id} with model {model}...")
 
-    response = client.messages.create(
-        model=model,
-        max_tokens=8192,
-        system=PROCESS_SYSTEM_PROMPT,
-        messages=[{"role": "user", "content": user_msg}],
-        tools=[OUTPUT_TOOL],
-        tool_choice={"type": "tool", "name": "output_section_data"},
-    )
+    # Streamed so the response is received incrementally while other forms are in flight.
+    if limiter is not None:
+        await limiter.acquire(estimate_input_tokens(request))
+    async with client.messages.stream(**request) as stream:
+        response = await stream.get_final_message()
+    if limiter is not None:
+        limiter.update(stream.response.headers)
+
+    result = parse_process_response(process_id, response, usage_totals)
+    if cache is not None and result is not None:
+        await asyncio.to_thread(cache.put, request, find_tool_input(response, "output_section_data"))
+    return result
 
-    for block in response.content:
-        if block.type == "tool_use" and block.name == "output_section_data":
-            data = block.input
-            warnings = validate_output(data)
-            for w in warnings:
-                logger.warning(f"  {process_id}: {w}")
-            data = strip_invalid_items(data)
-            return data
 
-    logger.error(f"No tool_use block in response for process {process_id}")
-    return None
+async def submit_message_batch(
+    client: "anthropic.AsyncAnthropic",
+    requests: dict[str, dict],
+    label: str,
+) -> dict:
+    """Submit requests (custom_id → messages.create params) as one Message Batch and wait for it.
+
+    Returns the response message for every request that succeeded, keyed by
+    custom_id. Batches are billed at half the synchronous rate but may take
+    up to 24h, so this is for non-interactive full runs only.
+    """
+    batch = await client.messages.batches.create(
+        requests=[{"custom_id": custom_id, "params": params} for custom_id, params in requests.items()]
+    )
+    logger.info(f"Submitted batch {batch.id} ({len(requests)} {label})")
+
+    while batch.processing_status != "ended":
+        await asyncio.sleep(BATCH_POLL_INTERVAL)
+        batch = await client.messages.batches.retrieve(batch.id)
+        counts = batch.request_counts
+        logger.info(f"  Batch {batch.id}: {counts.processing} processing, {counts.succeeded} succeeded, {counts.errored} errored")
+
+    messages = {}
+    async for entry in await client.messages.batches.results(batch.id):
+        result = entry.result
+        if result.type == "succeeded":
+            messages[entry.custom_id] = result.message
+        elif result.type == "errored":
+            error = result.error.error
+            logger.error(f"Batch request {entry.custom_id} errored: {error.type}: {error.message}")
+        else:  # expired (not processed within 24h) or canceled
+            logger.error(f"Batch request {entry.custom_id} did not run: {result.type}")
+
+    counts = batch.request_counts
+    logger.info(
+        f"Batch {batch.id} ended: {counts.succeeded} succeeded, {counts.errored} errored, "
+        f"{counts.expired} expired, {counts.canceled} canceled"
+    )
+    if len(messages) < len(requests):
+        logger.warning(f"  {len(requests) - len(messages)} {label} failed — re-run to retry them")
+    return messages
+
+
+async def call_process_architect_batch(
+    client: "anthropic.AsyncAnthropic",
+    jobs: list[tuple],
+    usage_totals: Counter | None = None,
+    cache: ResponseCache | None = None,
+) -> dict[str, dict | None]:
+    """Submit all process forms as one Message Batch and return parsed SectionData by process ID.
+
+    Forms with a cached response are answered from the cache and left out of the batch.
+    """
+    results = {}
+    requests = {}
+    for process_id, form_def, text_nodes, model, feedback in jobs:
+        request = build_process_request(process_id, form_def, text_nodes, model, feedback)
+        cached = cache.get(request) if cache is not None else None
+        if cached is not None:
+            logger.info(f"Using cached response for process {process_id}")
+            results[process_id] = validate_process_output(process_id, cached)
+        else:
+            requests[process_id] = request
+    if not requests:
+        return results
+
+    messages = await submit_message_batch(client, requests, "process forms")
+    for process_id, message in messages.items():
+        # One bad message must not lose the rest of the (already billed) batch
+        try:
+            results[process_id] = parse_process_response(process_id, message, usage_totals)
+            if cache is not None and results[process_id] is not None:
+                cache.put(requests[process_id], find_tool_input(message, "output_section_data"))
+        except Exception as e:
+            logger.error(f"Process {process_id} failed: {e}")
+            results[process_id] = None
+    return results
 
 
 def inject_static_fields(result: dict, form_def: dict) -> dict:
@@ -721,10 +1079,108 @@ def inject_static_fields(result: dict, form_def: dict) -> dict:
     return result
 
 
+def load_json(path: str):
+    """Read a JSON file — orjson when installed, stdlib json otherwise."""
+    with open(path, "rb") as f:
+        raw = f.read()
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def dumps_json(data) -> bytes:
+    """Serialise data as 2-space-indented JSON — orjson when installed, stdlib json otherwise."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode()
+
+
+def write_json_atomic(path: str, data) -> None:
+    """Write JSON via a temp file + os.replace so an interrupted run never leaves a partial file."""
+    payload = dumps_json(data)
+    with tempfile.NamedTemporaryFile("wb", dir=os.path.dirname(path) or ".", suffix=".tmp", delete=False) as f:
+        tmp_path = f.name
+        try:
+            f.write(payload)
+            # NamedTemporaryFile creates 0600; outputs are meant to be readable like any other file
+            os.chmod(tmp_path, 0o644)
+        except BaseException:
+            f.close()
+            os.unlink(tmp_path)
+            raise
+    os.replace(tmp_path, path)
+
+
+def is_output_current(output_path: str, input_paths: list[str]) -> bool:
+    """True if output_path exists and is newer than every input path that exists."""
+    # One stat per path (rather than exists + getmtime), treating a vanished file as absent
+    try:
+        output_mtime = os.stat(output_path).st_mtime
+    except FileNotFoundError:
+        return False
+    for path in input_paths:
+        try:
+            if os.stat(path).st_mtime >= output_mtime:
+                return False
+        except FileNotFoundError:
+            continue
+    return True
+
+
+def finalize_process_result(process_id: str, form_def: dict, text_nodes: list[TextNode],
+                            result: dict, feedback: dict | None = None) -> tuple[dict, dict]:
+    """Apply post-LLM steps to a process result. Returns (result, coverage_report)."""
+    # Inject static fields (sub_scoping, form_links)
+    result = inject_static_fields(result, form_def)
+
+    # Apply feedback overrides (post-LLM, not sent to LLM)
+    if feedback:
+        result = apply_feedback_overrides(result, feedback)
+
+    # Coverage audit
+    report = compute_coverage_report(process_id, text_nodes, result)
+
+    # Add gating rule if this process is gated (and the model hasn't already emitted the same gate)
+    if form_def["gated_by"]:
+        target_section = form_def["source_groups"][0]
+        gating_rule = {
+            "target": target_section,
+            "scope": form_def["gated_by"],
+            "effect": "SHOW",
+            "schema": {"const": "Yes"},
+        }
+        if not any(r.get("target") == target_section and r.get("scope") == form_def["gated_by"]
+                   for r in result["rules"]):
+            result["rules"].insert(0, gating_rule)
+
+    return result, report
+
+
 def run_process_architect(run_dir: str, single_process: str | None = None,
                           dry_run: bool = False, model_override: str | None = None,
-                          run_review: bool = False):
+                          run_review: bool = False, batch: bool = False, force: bool = False,
+                          max_concurrency: int = MAX_CONCURRENCY,
+                          route_threshold: int = ROUTE_TOKEN_THRESHOLD, use_cache: bool = True,
+                          review_only_problematic: bool = False):
     """Process-mode pipeline: one LLM call per process form."""
+    asyncio.run(run_process_architect_async(
+        run_dir, single_process, dry_run, model_override, run_review, batch, force,
+        max_concurrency, route_threshold, use_cache, review_only_problematic,
+    ))
+
+
+async def run_process_architect_async(run_dir: str, single_process: str | None = None,
+                                      dry_run: bool = False, model_override: str | None = None,
+                                      run_review: bool = False, batch: bool = False, force: bool = False,
+                                      max_concurrency: int = MAX_CONCURRENCY,
+                                      route_threshold: int = ROUTE_TOKEN_THRESHOLD, use_cache: bool = True,
+                                      review_only_problematic: bool = False):
+    """Async body of run_process_architect — process forms are dispatched concurrently.
+
+    Each form's output is written as soon as it completes, and forms whose
+    output is newer than all of its inputs are reused rather than regenerated
+    (unless force), so an interrupted run resumes where it stopped. Forms that
+    are regenerated with an unchanged prompt are answered from the on-disk
+    response cache (unless use_cache is off; force bypasses cache lookups).
+    """
 
     # Load data
     enriched_path = os.path.join(run_dir, "groups_enriched.json")
@@ -732,8 +1188,8 @@ def run_process_architect(run_dir: str, single_process: str | None = None,
         logger.error(f"groups_enriched.json not found in {run_dir}. Run 'python main.py enrich' first.")
         sys.exit(1)
 
-    with open(enriched_path) as f:
-        groups = json.load(f)
+    groups = load_json(enriched_path)
+    group_map = {g["id"]: g for g in groups}
 
     # Determine which processes to run
     if single_process:
@@ -747,125 +1203,178 @@ def run_process_architect(run_dir: str, single_process: str | None = None,
     # Create API client (unless dry run)
     client = None
     if not dry_run:
-        client = anthropic.Anthropic()
+        import anthropic
+        client = anthropic.AsyncAnthropic(max_retries=API_MAX_RETRIES, timeout=API_TIMEOUT)
 
-    # Output directory
-    processes_dir = os.path.join(run_dir, "processes")
-    if not dry_run:
-        os.makedirs(processes_dir, exist_ok=True)
+    # Close the client (and its connection pool) deterministically, even on failure
+    try:
+        # Output directory
+        processes_dir = os.path.join(run_dir, "processes")
+        if not dry_run:
+            os.makedirs(processes_dir, exist_ok=True)
+        output_paths = {pid: os.path.join(processes_dir, f"{pid}.json") for pid in processes_to_run}
+
+        # Coverage reports accumulator
+        coverage_reports: dict[str, dict] = {}
+
+        # Gather inputs for every process up front — the LLM calls are independent
+        jobs = []
+        text_nodes_by_process: dict[str, list[TextNode]] = {}
+        # Final process outputs, kept so the review pass needn't re-read them from disk
+        results_by_process: dict[str, dict] = {}
+        total = len(processes_to_run)
+        for i, (process_id, form_def) in enumerate(processes_to_run.items(), 1):
+            # Gather text nodes
+            text_nodes = gather_process_nodes(process_id, group_map)
+            text_nodes_by_process[process_id] = text_nodes
+
+            if not text_nodes:
+                logger.info(f"[{i}/{total}] Skipping {process_id} (no text nodes)")
+                continue
+
+            # Resume: reuse outputs newer than the enriched groups, this form's
+            # feedback and this module (prompts and PROCESS_FORMS live here)
+            output_path = output_paths[process_id]
+            feedback_path = os.path.join(run_dir, FEEDBACK_DIR, f"{process_id}.json")
+            if not dry_run and not force and is_output_current(output_path, [enriched_path, feedback_path, __file__]):
+                logger.info(f"[{i}/{total}] {process_id} is up to date — reusing {process_id}.json (use --force to regenerate)")
+                existing = load_json(output_path)
+                results_by_process[process_id] = existing
+                coverage_reports[process_id] = compute_coverage_report(process_id, text_nodes, existing)
+                continue
+
+            # Select model
+            text_tokens = estimate_text_tokens(text_nodes)
+            model = model_override or select_model(text_tokens, route_threshold)
 
-    # Coverage reports accumulator
-    coverage_reports: dict[str, dict] = {}
+            logger.info(
+                f"[{i}/{total}] Processing {process_id} ({len(text_nodes)} nodes, ~{text_tokens} text tokens, "
+                f"model={model.split('-')[1] if '-' in model else model})"
+            )
 
-    total = len(processes_to_run)
-    for i, (process_id, form_def) in enumerate(processes_to_run.items(), 1):
-        # Gather text nodes
-        text_nodes = gather_process_nodes(process_id, groups)
+            # Load feedback if available
+            feedback = load_feedback(run_dir, process_id)
 
-        if not text_nodes:
-            logger.info(f"[{i}/{total}] Skipping {process_id} (no text nodes)")
-            continue
+            jobs.append((process_id, form_def, text_nodes, model, feedback))
 
-        # Select model
-        if model_override:
-            model = model_override
-        else:
-            model = MODEL_LARGE if len(text_nodes) >= TEXT_NODE_THRESHOLD else MODEL_SMALL
+        # Fan out the API calls; the semaphore caps requests in flight and the
+        # limiter (shared with the review pass) caps requests and tokens per minute
+        sem = asyncio.Semaphore(max_concurrency)
+        limiter = RateLimiter(API_RPM, API_TPM)
+        usage_totals = Counter()  # token usage across every process and review call
+        cache = ResponseCache(LLM_CACHE_DIR, refresh=force) if use_cache and not dry_run else None
 
-        logger.info(f"[{i}/{total}] Processing {process_id} ({len(text_nodes)} nodes, model={model.split('-')[1] if '-' in model else model})")
+        async def finish(process_id, form_def, text_nodes, feedback, result):
+            if result is None:
+                return None
 
-        # Load feedback if available
-        feedback = load_feedback(run_dir, process_id)
+            result, report = finalize_process_result(process_id, form_def, text_nodes, result, feedback)
+            log_coverage_report(report)
+            results_by_process[process_id] = result
 
-        result = call_process_architect(
-            client, process_id, form_def, text_nodes, model, dry_run, feedback,
-        )
+            # Write output
+            if not dry_run:
+                output_path = output_paths[process_id]
+                # Off the event loop so the write overlaps other forms' in-flight API calls
+                await asyncio.to_thread(write_json_atomic, output_path, result)
+                logger.info(
+                    f"Wrote {process_id}.json — "
+                    f"{len(result['controls'])} controls, "
+                    f"{len(result['groups'])} groups, "
+                    f"{len(result['rules'])} rules, "
+                    f"{len(result['sub_scoping'])} sub-types, "
+                    f"{len(result['form_links'])} form-links"
+                )
 
-        if result is None:
-            continue
+            return report
 
-        # Inject static fields (sub_scoping, form_links)
-        result = inject_static_fields(result, form_def)
-
-        # Apply feedback overrides (post-LLM, not sent to LLM)
-        if feedback:
-            result = apply_feedback_overrides(result, feedback)
-
-        # Coverage audit
-        report = compute_coverage_report(process_id, text_nodes, result)
-        coverage_reports[process_id] = report
-        log_coverage_report(report)
-
-        # Add gating rule if this process is gated
-        if form_def["gated_by"]:
-            target_section = form_def["source_groups"][0]
-            gating_rule = {
-                "target": target_section,
-                "scope": form_def["gated_by"],
-                "effect": "SHOW",
-                "schema": {"const": "Yes"},
-            }
-            result["rules"].insert(0, gating_rule)
+        async def run_one(process_id, form_def, text_nodes, model, feedback):
+            async with sem:
+                result = await call_process_architect(
+                    client, process_id, form_def, text_nodes, model, dry_run, feedback, limiter, usage_totals, cache,
+                )
+            # Post-process as soon as this form returns, while other calls are still in flight
+            return await finish(process_id, form_def, text_nodes, feedback, result)
+
+        # Batch mode only pays off for unattended full runs; dry runs and
+        # single-process runs keep the low-latency streaming path.
+        use_batch = batch and not dry_run and not single_process and bool(jobs)
+        if batch and not use_batch and jobs:
+            logger.info("--batch ignored for dry runs and single-process runs")
+
+        if use_batch:
+            batch_results = await call_process_architect_batch(client, jobs, usage_totals, cache)
+            reports = []
+            for process_id, form_def, text_nodes, model, feedback in jobs:
+                try:
+                    reports.append(await finish(process_id, form_def, text_nodes, feedback, batch_results.get(process_id)))
+                except Exception as e:
+                    reports.append(e)
+        else:
+            # return_exceptions so one failed process doesn't abort the rest of the batch
+            reports = await asyncio.gather(*(run_one(*job) for job in jobs), return_exceptions=True)
 
-        # Write output
-        if not dry_run:
-            output_path = os.path.join(processes_dir, f"{process_id}.json")
-            with open(output_path, "w") as f:
-                json.dump(result, f, indent=2)
-            logger.info(
-                f"Wrote {process_id}.json — "
-                f"{len(result['controls'])} controls, "
-                f"{len(result['groups'])} groups, "
-                f"{len(result['rules'])} rules, "
-                f"{len(result['sub_scoping'])} sub-types, "
-                f"{len(result['form_links'])} form-links"
-            )
+        for (process_id, *_), report in zip(jobs, reports):
+            if isinstance(report, Exception):
+                logger.error(f"Process {process_id} failed: {report}")
+            elif report is not None:
+                coverage_reports[process_id] = report
+
+        # Keep the audit in PROCESS_FORMS order (reused forms were recorded first)
+        coverage_reports = {pid: coverage_reports[pid] for pid in processes_to_run if pid in coverage_reports}
 
-        # Rate limiting
         if not dry_run:
-            time.sleep(0.5)
+            # Write coverage audit report
+            if coverage_reports:
+                audit_path = os.path.join(processes_dir, "_coverage_audit.json")
+                total_input = total_mapped = total_unmapped = total_low_conf = 0
+                for r in coverage_reports.values():
+                    total_input += r["total_input"]
+                    total_mapped += r["total_mapped"]
+                    total_unmapped += r["total_unmapped"]
+                    total_low_conf += len(r["low_confidence"])
+                overall_pct = round(total_mapped / total_input * 100, 1) if total_input else 100.0
+
+                audit_data = {
+                    "summary": {
+                        "overall_coverage_pct": overall_pct,
+                        "total_input_rules": total_input,
+                        "total_mapped_rules": total_mapped,
+                        "total_unmapped_rules": total_unmapped,
+                        "total_low_confidence_controls": total_low_conf,
+                        "processes_audited": len(coverage_reports),
+                    },
+                    "processes": coverage_reports,
+                }
+                write_json_atomic(audit_path, audit_data)
+                logger.info(f"Coverage audit → {audit_path}")
+
+                print(f"\nCoverage: {overall_pct}% ({total_mapped}/{total_input} rules)")
+                if total_unmapped > 0:
+                    print(f"  Unmapped rules: {total_unmapped}")
+                if total_low_conf > 0:
+                    print(f"  Low confidence controls: {total_low_conf}")
+
+            if run_review and coverage_reports:
+                logger.info("Starting second-pass review...")
+                # Review batching follows --batch; single-process reviews stay synchronous
+                review_results = await run_review_pass(
+                    client, run_dir, text_nodes_by_process, coverage_reports, results_by_process,
+                    batch=batch and not single_process, limiter=limiter, max_concurrency=max_concurrency,
+                    usage_totals=usage_totals, only_problematic=review_only_problematic, cache=cache,
+                )
+                review_path = os.path.join(processes_dir, "_review_results.json")
+                write_json_atomic(review_path, review_results)
+                logger.info(f"Review results → {review_path}")
 
-    if not dry_run:
-        # Write coverage audit report
-        if coverage_reports:
-            audit_path = os.path.join(processes_dir, "_coverage_audit.json")
-            total_input = sum(r["total_input"] for r in coverage_reports.values())
-            total_mapped = sum(r["total_mapped"] for r in coverage_reports.values())
-            total_unmapped = sum(r["total_unmapped"] for r in coverage_reports.values())
-            total_low_conf = sum(len(r["low_confidence"]) for r in coverage_reports.values())
-            overall_pct = round(total_mapped / total_input * 100, 1) if total_input else 100.0
-
-            audit_data = {
-                "summary": {
-                    "overall_coverage_pct": overall_pct,
-                    "total_input_rules": total_input,
-                    "total_mapped_rules": total_mapped,
-                    "total_unmapped_rules": total_unmapped,
-                    "total_low_confidence_controls": total_low_conf,
-                    "processes_audited": len(coverage_reports),
-                },
-                "processes": coverage_reports,
-            }
-            with open(audit_path, "w") as f:
-                json.dump(audit_data, f, indent=2)
-            logger.info(f"Coverage audit → {audit_path}")
-
-            print(f"\nCoverage: {overall_pct}% ({total_mapped}/{total_input} rules)")
-            if total_unmapped > 0:
-                print(f"  Unmapped rules: {total_unmapped}")
-            if total_low_conf > 0:
-                print(f"  Low confidence controls: {total_low_conf}")
-
-        if run_review and coverage_reports:
-            logger.info("Starting second-pass review...")
-            review_results = run_review_pass(client, run_dir, groups, coverage_reports)
-            review_path = os.path.join(processes_dir, "_review_results.json")
-            with open(review_path, "w") as f:
-                json.dump(review_results, f, indent=2)
-            logger.info(f"Review results → {review_path}")
-
-        print(f"\nDone! Process files written to {processes_dir}/")
-        print(f"  Process forms: {total}")
+            if usage_totals:
+                log_usage_summary(usage_totals)
+
+            print(f"\nDone! Process files written to {processes_dir}/")
+            print(f"  Process forms: {total}")
+    finally:
+        if client is not None:
+            await client.close()
 
 
 # ---------------------------------------------------------------------------
@@ -940,98 +1449,216 @@ For unmapped rules, assess whether:
 """
 
 
-def run_review_pass(
-    client: anthropic.Anthropic,
-    run_dir: str,
-    groups: list[dict],
-    coverage_reports: dict[str, dict],
-) -> dict:
-    """Run second-pass review on process forms."""
-    processes_dir = os.path.join(run_dir, "processes")
-    all_reviews = {}
+def review_max_tokens(n_items: int) -> int:
+    """Output budget for a review of n_items controls and unmapped rules.
 
-    for process_id, report in coverage_reports.items():
-        process_path = os.path.join(processes_dir, f"{process_id}.json")
-        if not os.path.exists(process_path):
-            continue
+    Stored reviews use 30–145 tokens per item, so 150 each plus 1k headroom
+    bounds how long a small form's review can run; a review that still hits
+    the limit is retried once at REVIEW_MAX_TOKENS.
+    """
+    return min(REVIEW_MAX_TOKENS, 1024 + 150 * n_items)
 
-        with open(process_path) as f:
-            result = json.load(f)
 
-        text_nodes = gather_process_nodes(process_id, groups)
+def build_review_request(process_id: str, result: dict, text_nodes: list[TextNode], report: dict) -> dict:
+    """Build the messages.create params for reviewing one process form's output."""
+    title = PROCESS_FORMS[process_id]["title"]
+    controls = result.get("controls", [])
 
-        nodes_text = ""
-        for tn in text_nodes:
-            prefix = f"[{tn['rule_code']}] " if tn["rule_code"] else ""
-            nodes_text += f"  {prefix}{tn['text']}\n"
+    nodes_text = "".join([
+        f"  [{tn['rule_code']}] {tn['text']}\n" if tn["rule_code"] else f"  {tn['text']}\n"
+        for tn in text_nodes
+    ])
 
-        controls_text = ""
-        for ctrl in result.get("controls", []):
-            src = ", ".join(ctrl.get("source-rules", []))
-            conf = ctrl.get("mapping-confidence", "N/A")
-            controls_text += f"  {ctrl['id']} (group: {ctrl.get('group', '?')}): {ctrl['label']}\n"
-            controls_text += f"    source-rules: [{src}]\n"
-            controls_text += f"    mapping-confidence: {conf}\n"
-            controls_text += f"    correct-option: {ctrl.get('correct-option', '?')}\n\n"
-
-        unmapped_text = ""
-        if report["unmapped_codes"]:
-            unmapped_text = f"\n## Unmapped Rules ({len(report['unmapped_codes'])})\n"
-            for code in report["unmapped_codes"]:
-                matching = [tn for tn in text_nodes if tn.get("rule_code") == code]
-                text = matching[0]["text"] if matching else "(text not found)"
-                unmapped_text += f"  [{code}] {text}\n"
-
-        user_msg = f"""## Review: {PROCESS_FORMS[process_id]['title']}
+    controls_parts = []
+    for ctrl in controls:
+        src = ", ".join(ctrl.get("source-rules", []))
+        conf = ctrl.get("mapping-confidence", "N/A")
+        controls_parts.append(
+            f"  {ctrl['id']} (group: {ctrl.get('group', '?')}): {ctrl['label']}\n"
+            f"    source-rules: [{src}]\n"
+            f"    mapping-confidence: {conf}\n"
+            f"    correct-option: {ctrl.get('correct-option', '?')}\n\n"
+        )
+    controls_text = "".join(controls_parts)
+
+    unmapped_text = ""
+    if report["unmapped_codes"]:
+        # First node carrying each rule code (reversed so earlier nodes overwrite later ones)
+        text_by_code = {tn["rule_code"]: tn["text"] for tn in reversed(text_nodes) if tn.get("rule_code")}
+        unmapped_parts = [f"\n## Unmapped Rules ({len(report['unmapped_codes'])})\n"]
+        for code in report["unmapped_codes"]:
+            text = text_by_code.get(code, "(text not found)")
+            unmapped_parts.append(f"  [{code}] {text}\n")
+        unmapped_text = "".join(unmapped_parts)
+
+    user_msg = f"""## Review: {title}
 
 ## Original Regulatory Text ({len(text_nodes)} nodes)
 {nodes_text}
 
-## Controls Produced ({len(result.get('controls', []))})
+## Controls Produced ({len(controls)})
 {controls_text}
 {unmapped_text}
 
 Review each control mapping and assess the unmapped rules.
 """
 
-        logger.info(f"  Reviewing {process_id}...")
+    return {
+        "model": MODEL_SMALL,
+        "max_tokens": review_max_tokens(len(controls) + len(report["unmapped_codes"])),
+        # Breakpoint on the system block caches tools + system, shared by every review
+        "system": [{"type": "text", "text": REVIEW_SYSTEM_PROMPT, "cache_control": EPHEMERAL_CACHE}],
+        "messages": [{"role": "user", "content": user_msg}],
+        "tools": [REVIEW_TOOL],
+        "tool_choice": {"type": "tool", "name": "output_review"},
+    }
+
 
-        response = client.messages.create(
-            model=MODEL_SMALL,
-            max_tokens=4096,
-            system=REVIEW_SYSTEM_PROMPT,
-            messages=[{"role": "user", "content": user_msg}],
-            tools=[REVIEW_TOOL],
-            tool_choice={"type": "tool", "name": "output_review"},
-        )
+def parse_review_response(process_id: str, response, usage_totals: Counter | None = None) -> dict | None:
+    """Extract the review tool input from a review-call response and log its quality summary."""
+    log_usage(f"review {process_id}", response.usage, usage_totals)
+    if response.stop_reason == "max_tokens":
+        logger.error(f"Review of {process_id} truncated at max_tokens — discarding")
+        return None
+    review_data = find_tool_input(response, "output_review")
+    if review_data is None:
+        logger.error(f"No tool_use block in review response for process {process_id}")
+        return None
+    log_review_summary(process_id, review_data)
+    return review_data
+
+
+def log_review_summary(process_id: str, review_data: dict) -> None:
+    """Log the quality breakdown and any should-be-mapped rules from a review."""
+    quality_counts = Counter(r.get("quality") for r in review_data.get("reviews", []))
+    logger.info(
+        f"  Review {process_id}: {quality_counts.get('good', 0)} good, "
+        f"{quality_counts.get('acceptable', 0)} acceptable, "
+        f"{quality_counts.get('questionable', 0)} questionable, "
+        f"{quality_counts.get('incorrect', 0)} incorrect"
+    )
 
-        for block in response.content:
-            if block.type == "tool_use" and block.name == "output_review":
-                review_data = block.input
-                all_reviews[process_id] = review_data
+    unmapped = review_data.get("unmapped_assessment", [])
+    should_map = [u for u in unmapped if u.get("reason") == "should_be_mapped"]
+    if should_map:
+        logger.warning(f"  {len(should_map)} unmapped rules SHOULD have been mapped:")
+        for u in should_map:
+            logger.warning(f"    {u.get('rule_code', '?')}: {u.get('explanation', '')}")
 
-                reviews = review_data.get("reviews", [])
-                quality_counts = defaultdict(int)
-                for r in reviews:
-                    quality_counts[r["quality"]] += 1
-                logger.info(
-                    f"  Review: {quality_counts.get('good', 0)} good, "
-                    f"{quality_counts.get('acceptable', 0)} acceptable, "
-                    f"{quality_counts.get('questionable', 0)} questionable, "
-                    f"{quality_counts.get('incorrect', 0)} incorrect"
-                )
 
-                unmapped = review_data.get("unmapped_assessment", [])
-                should_map = [u for u in unmapped if u["reason"] == "should_be_mapped"]
-                if should_map:
-                    logger.warning(f"  {len(should_map)} unmapped rules SHOULD have been mapped:")
-                    for u in should_map:
-                        logger.warning(f"    {u['rule_code']}: {u.get('explanation', '')}")
-                break
+async def run_review_pass(
+    client: "anthropic.AsyncAnthropic",
+    run_dir: str,
+    text_nodes_by_process: dict[str, list[TextNode]],
+    coverage_reports: dict[str, dict],
+    results_by_process: dict[str, dict] | None = None,
+    batch: bool = False,
+    limiter: RateLimiter | None = None,
+    max_concurrency: int = MAX_CONCURRENCY,
+    usage_totals: Counter | None = None,
+    only_problematic: bool = False,
+    cache: ResponseCache | None = None,
+) -> dict:
+    """Run second-pass review on process forms — concurrently, or as one Message Batch when batch is set.
+
+    Outputs are taken from results_by_process when present, otherwise read
+    back from processes/. Forms with neither controls nor unmapped rules are
+    skipped, as are (with only_problematic) forms the coverage audit didn't flag.
+    Reviews whose request is unchanged are answered from the response cache.
+    """
+    processes_dir = os.path.join(run_dir, "processes")
+    results_by_process = results_by_process or {}
+
+    requests = {}
+    for process_id, report in coverage_reports.items():
+        # Decide from the coverage report alone, before loading the output or spending a call
+        if not report["total_controls"] and not report["unmapped_codes"]:
+            logger.info(f"  Skipping review of {process_id} (nothing to review)")
+            continue
+        if only_problematic and not needs_review(report):
+            logger.info(f"  Skipping review of {process_id} (no coverage issues)")
+            continue
+
+        result = results_by_process.get(process_id)
+        if result is None:
+            process_path = os.path.join(processes_dir, f"{process_id}.json")
+            if not os.path.exists(process_path):
+                continue
+            result = load_json(process_path)
 
-        time.sleep(0.5)
+        text_nodes = text_nodes_by_process[process_id]
+        requests[process_id] = build_review_request(process_id, result, text_nodes, report)
 
-    return all_reviews
+    review_order = list(requests)
+    all_reviews = {}
+    if cache is not None:
+        for process_id, request in list(requests.items()):
+            cached = cache.get(request)
+            if cached is not None:
+                logger.info(f"  Using cached review for {process_id}")
+                log_review_summary(process_id, cached)
+                all_reviews[process_id] = cached
+                del requests[process_id]
+
+    sem = asyncio.Semaphore(max_concurrency)
+
+    async def review_one(process_id, request):
+        async with sem:
+            if limiter is not None:
+                await limiter.acquire(estimate_input_tokens(request))
+            logger.info(f"  Reviewing {process_id}...")
+            async with client.messages.stream(**request) as stream:
+                response = await stream.get_final_message()
+            if limiter is not None:
+                limiter.update(stream.response.headers)
+            return response
+
+    async def stream_reviews(reqs: dict) -> list[tuple]:
+        # return_exceptions so one failed review doesn't discard the others
+        results = await asyncio.gather(
+            *(review_one(process_id, request) for process_id, request in reqs.items()),
+            return_exceptions=True,
+        )
+        responses = []
+        for process_id, response in zip(reqs, results):
+            if isinstance(response, Exception):
+                logger.error(f"Review of {process_id} failed: {response}")
+            else:
+                responses.append((process_id, response))
+        return responses
+
+    if not requests:
+        responses = []
+    elif batch:
+        messages = await submit_message_batch(client, requests, "reviews")
+        responses = [(process_id, messages[process_id]) for process_id in requests if process_id in messages]
+    else:
+        responses = await stream_reviews(requests)
+
+    retried = set()
+    while responses:
+        retries = {}
+        for process_id, response in responses:
+            # One malformed review must not lose the rest of the (already billed) pass
+            try:
+                review_data = parse_review_response(process_id, response, usage_totals)
+                if review_data is not None:
+                    all_reviews[process_id] = review_data
+                    # Keyed by the original request, so a review that needed the retry is a cache hit next run
+                    if cache is not None:
+                        cache.put(requests[process_id], review_data)
+                elif (response.stop_reason == "max_tokens" and process_id not in retried
+                      and requests[process_id]["max_tokens"] < REVIEW_MAX_TOKENS):
+                    retries[process_id] = {**requests[process_id], "max_tokens": REVIEW_MAX_TOKENS}
+            except Exception as e:
+                logger.error(f"Review of {process_id} failed: {e}")
+
+        # Retry truncated reviews once at the full budget; streamed even in batch mode, as there are few
+        if retries:
+            logger.warning(f"  Retrying {len(retries)} truncated review(s) with max_tokens={REVIEW_MAX_TOKENS}")
+            retried.update(retries)
+        responses = await stream_reviews(retries) if retries else []
+    return {process_id: all_reviews[process_id] for process_id in review_order if process_id in all_reviews}
 
 
 # ---------------------------------------------------------------------------
@@ -1039,84 +1666,113 @@ Review each control mapping and assess the unmapped rules.
 # ---------------------------------------------------------------------------
 
 
-def validate_output(data: dict) -> list[str]:
-    """Validate controls, groups, and rules. Returns list of warnings."""
+def check_output_shape(data) -> list[str]:
+    """Check the tool input is an object whose controls/groups/rules are lists of objects. Returns list of errors."""
+    if not isinstance(data, dict):
+        return [f"Tool input is {type(data).__name__}, expected object"]
+
+    errors = []
+    for key in ("controls", "groups", "rules"):
+        items = data.get(key, [])
+        if not isinstance(items, list):
+            errors.append(f"'{key}' is {type(items).__name__}, expected array")
+        elif not all(isinstance(item, dict) for item in items):
+            errors.append(f"'{key}' contains non-object items")
+    return errors
+
+
+def is_valid_rule_target(target: str) -> bool:
+    """A rule may target either a control ID or a group slug."""
+    return isinstance(target, str) and bool(ID_REGEX.fullmatch(target) or SLUG_REGEX.fullmatch(target))
+
+
+def validate_and_strip(data: dict) -> tuple[dict, list[str]]:
+    """Validate controls, groups, and rules in one pass per collection.
+
+    Returns the data with invalid items removed (controls with invalid IDs or
+    missing/unknown group refs, groups with invalid slugs, rules with invalid
+    targets or repeating an earlier rule) and the list of warnings.
+    """
     warnings = []
 
-    # Collect valid group slugs
+    # Groups: keep valid slugs
+    valid_groups = []
     valid_group_slugs = set()
     for group in data.get("groups", []):
         gid = group.get("id", "")
-        if not SLUG_REGEX.match(gid):
-            warnings.append(f"Invalid group ID (must be slug): '{gid}'")
-        else:
+        if isinstance(gid, str) and SLUG_REGEX.fullmatch(gid):
+            valid_groups.append(group)
             valid_group_slugs.add(gid)
+        else:
+            warnings.append(f"Invalid group ID (must be slug): '{gid}'")
         if group.get("variant") not in ("main", "subprocess"):
             warnings.append(f"Group '{gid}' missing valid variant ('main' or 'subprocess')")
 
-    # Validate controls
-    control_ids = set()
+    # Controls: keep valid IDs that reference a valid group, noting referenced groups for the orphan check
+    valid_controls = []
+    referenced_groups = set()
     for control in data.get("controls", []):
         cid = control.get("id", "")
-        if not ID_REGEX.match(cid):
+        valid_id = isinstance(cid, str) and ID_REGEX.fullmatch(cid)
+        if not valid_id:
             warnings.append(f"Invalid control ID: '{cid}'")
-        else:
-            control_ids.add(cid)
 
         group_ref = control.get("group", "")
         if not group_ref:
             warnings.append(f"Control '{cid}' missing 'group' field")
-        elif group_ref not in valid_group_slugs:
+            continue
+        if not isinstance(group_ref, str) or group_ref not in valid_group_slugs:
             warnings.append(f"Control '{cid}' references unknown group slug: '{group_ref}'")
+            continue
+        referenced_groups.add(group_ref)
+        if valid_id:
+            valid_controls.append(control)
 
     # Check for orphan groups (groups with no controls)
-    referenced_groups = {c.get("group") for c in data.get("controls", []) if c.get("group")}
     for gid in valid_group_slugs:
         if gid not in referenced_groups:
             warnings.append(f"Orphan group: '{gid}' has no controls referencing it")
 
-    # Validate rules
+    # Rules: keep valid targets, dropping exact repeats of a rule already kept
+    valid_rules = []
+    seen_rules = set()
     for rule in data.get("rules", []):
         target = rule.get("target", "")
-        # Target can be either a control ID or a group slug
-        if not ID_REGEX.match(target) and not SLUG_REGEX.match(target):
+        if not is_valid_rule_target(target):
             warnings.append(f"Invalid rule target: '{target}'")
-
-    return warnings
-
-
-def strip_invalid_items(data: dict) -> dict:
-    """Remove controls with invalid IDs or missing group refs, groups with invalid slugs."""
-    # Collect valid group slugs first
-    valid_groups = [g for g in data.get("groups", []) if SLUG_REGEX.match(g.get("id", ""))]
-    valid_group_slugs = {g["id"] for g in valid_groups}
-
-    # Filter controls: must have valid ID and valid group reference
-    valid_controls = []
-    for c in data.get("controls", []):
-        if not ID_REGEX.match(c.get("id", "")):
             continue
-        if c.get("group", "") not in valid_group_slugs:
+        key = json.dumps([target, rule.get("scope"), rule.get("effect"), rule.get("schema")], sort_keys=True)
+        if key in seen_rules:
+            warnings.append(f"Duplicate rule: {rule.get('effect')} '{target}' on '{rule.get('scope')}'")
             continue
-        valid_controls.append(c)
+        seen_rules.add(key)
+        valid_rules.append(rule)
 
-    # Filter rules: target must be valid (control ID or group slug)
-    valid_rules = []
-    for rule in data.get("rules", []):
-        target = rule.get("target", "")
-        if ID_REGEX.match(target) or SLUG_REGEX.match(target):
-            valid_rules.append(rule)
+    return {"controls": valid_controls, "groups": valid_groups, "rules": valid_rules}, warnings
 
-    stripped_controls = len(data.get("controls", [])) - len(valid_controls)
-    stripped_groups = len(data.get("groups", [])) - len(valid_groups)
-    stripped_rules = len(data.get("rules", [])) - len(valid_rules)
+
+def log_stripped_items(data: dict, stripped: dict) -> None:
+    """Log how many controls, groups, and rules validate_and_strip removed."""
+    stripped_controls, stripped_groups, stripped_rules = (
+        len(data.get(key, [])) - len(stripped[key]) for key in ("controls", "groups", "rules")
+    )
     if stripped_controls or stripped_groups or stripped_rules:
         logger.warning(
             f"  Stripped invalid items: {stripped_controls} controls, "
             f"{stripped_groups} groups, {stripped_rules} rules"
         )
 
-    return {"controls": valid_controls, "groups": valid_groups, "rules": valid_rules}
+
+def validate_output(data: dict) -> list[str]:
+    """Validate controls, groups, and rules. Returns list of warnings."""
+    return validate_and_strip(data)[1]
+
+
+def strip_invalid_items(data: dict) -> dict:
+    """Remove controls with invalid IDs or missing group refs, groups with invalid slugs."""
+    stripped, _ = validate_and_strip(data)
+    log_stripped_items(data, stripped)
+    return stripped
 
 
 # ---------------------------------------------------------------------------
@@ -1133,7 +1789,26 @@ if __name__ == "__main__":
     parser.add_argument("--model", help="Override model for all groups")
     parser.add_argument("--review", action="store_true",
                         help="Run second-pass review after generation")
+    parser.add_argument("--review-only-problematic", action="store_true",
+                        help="Review only forms whose coverage audit flagged unmapped rules, "
+                             "unknown source-rules or low-confidence controls (implies --review)")
+    parser.add_argument("--batch", action="store_true",
+                        help="Submit all process forms (and reviews) via the Message Batches API (50%% cheaper, up to 24h)")
+    parser.add_argument("--force", action="store_true",
+                        help="Regenerate process forms even if their output is newer than their inputs "
+                             "(fresh API calls: cached responses are not reused)")
+    parser.add_argument("--concurrency", type=int, default=MAX_CONCURRENCY,
+                        help=f"Max API calls in flight at once (default {MAX_CONCURRENCY})")
+    parser.add_argument("--route-threshold", type=int, default=ROUTE_TOKEN_THRESHOLD,
+                        help=f"Estimated regulatory-text tokens at which a form uses {MODEL_LARGE} "
+                             f"instead of {MODEL_SMALL} (default {ROUTE_TOKEN_THRESHOLD})")
+    parser.add_argument("--no-cache", action="store_true",
+                        help=f"Neither read nor write the LLM response cache in {LLM_CACHE_DIR}")
 
     args = parser.parse_args()
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
 
-    run_process_architect(args.run_dir, args.process, args.dry_run, args.model, args.review)
+    run_process_architect(args.run_dir, args.process, args.dry_run, args.model,
+                          args.review or args.review_only_problematic, args.batch, args.force,
+                          args.concurrency, args.route_threshold, not args.no_cache, args.review_only_problematic)
@@ -596,7 +596,7 @@ def save_groups_json(groups: list[dict], run_dir: str) -> str:
     """Write groups.json to the run directory."""
     output_path = os.path.join(run_dir, "groups.json")
     with open(output_path, "w") as f:
-        json.dump(groups, f, indent=2)
+        f.write(json.dumps(groups, indent=2))
     logger.info(f"Saved {len(groups)} groups → {output_path}")
     return output_path
 
@@ -738,7 +738,7 @@ def run_pipeline(pdf_path: str):
         output_nodes.append(out)
 
     with open(output_path, "w") as f:
-        json.dump(output_nodes, f, indent=2)
+        f.write(json.dumps(output_nodes, indent=2))
 
     # 6. Identify JSON Forms groups
     groups = build_groups(output_nodes)
@@ -781,7 +781,7 @@ def run_enrich(nodes_path: str, groups_path: str):
     run_dir = os.path.dirname(os.path.abspath(groups_path))
     output_path = os.path.join(run_dir, "groups_enriched.json")
     with open(output_path, "w") as f:
-        json.dump(enriched, f, indent=2)
+        f.write(json.dumps(enriched, indent=2))
 
     print(f"\nDone!")
     print(f"  groups_enriched.json : {output_path}")
@@ -85,7 +85,7 @@ class ComplianceHandler(http.server.SimpleHTTPRequestHandler):
 
         os.makedirs(FEEDBACK_DIR, exist_ok=True)
         with open(path, "w") as f:
-            json.dump(merged, f, indent=2)
+            f.write(json.dumps(merged, indent=2))
 
         response = b'{"ok": true}'
         self.send_response(200)
@@ -1,19 +1,49 @@
 #!/usr/bin/env python3
 """Tests for the architect pipeline and group enrichment."""
 
+import asyncio
 import json
+import stat
+from collections import Counter
+from types import SimpleNamespace
 import pytest
 from architect import (
+    check_output_shape,
+    is_valid_rule_target,
+    validate_and_strip,
     validate_output,
     gather_process_nodes,
     build_process_user_message,
+    build_process_static_block,
+    build_process_dynamic_block,
+    estimate_text_tokens,
+    select_model,
+    MODEL_LARGE,
+    MODEL_SMALL,
     extract_input_rule_codes,
     extract_output_rule_codes,
     compute_coverage_report,
+    TokenBucket,
+    RateLimiter,
+    estimate_input_tokens,
+    log_usage,
+    parse_process_response,
+    call_process_architect_batch,
+    finalize_process_result,
+    dumps_json,
+    load_json,
+    write_json_atomic,
+    is_output_current,
+    ResponseCache,
     ID_REGEX,
     SLUG_REGEX,
     PROCESS_FORMS,
     REVIEW_TOOL,
+    build_review_request,
+    review_max_tokens,
+    REVIEW_MAX_TOKENS,
+    needs_review,
+    run_review_pass,
 )
 
 try:
@@ -56,6 +86,38 @@ def sample_groups():
     ]
 
 
+@pytest.fixture
+def fake_response():
+    """Builder for Messages API responses carrying a single tool_use block."""
+    def build(tool_name, tool_input, stop_reason="tool_use", output_tokens=500, cache_read_input_tokens=None):
+        usage = SimpleNamespace(input_tokens=100, cache_creation_input_tokens=None,
+                                cache_read_input_tokens=cache_read_input_tokens, output_tokens=output_tokens)
+        block = SimpleNamespace(type="tool_use", name=tool_name, input=tool_input)
+        return SimpleNamespace(content=[block], usage=usage, stop_reason=stop_reason)
+    return build
+
+
+@pytest.fixture
+def fake_stream_client():
+    """Builder for an AsyncAnthropic stand-in whose messages.stream answers each request with respond(request)."""
+    class FakeStream:
+        def __init__(self, message):
+            self.message = message
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def get_final_message(self):
+            return self.message
+
+    def build(respond):
+        return SimpleNamespace(messages=SimpleNamespace(stream=lambda **request: FakeStream(respond(request))))
+    return build
+
+
 # ---------------------------------------------------------------------------
 # Enrichment tests
 # ---------------------------------------------------------------------------
@@ -134,6 +196,56 @@ class TestValidation:
         warnings = validate_output(data)
         assert any("Invalid group" in w for w in warnings)
 
+    def test_validate_and_strip_returns_stripped_data_and_warnings(self):
+        data = {
+            "controls": [{"id": "4_2_3_1", "group": "kyc"}, {"id": "bad_id", "group": "kyc"}],
+            "groups": [{"id": "kyc", "variant": "main"}, {"id": "4_2", "variant": "main"}],
+            "rules": [{"target": "kyc"}, {"target": "4.2.3"}],
+        }
+        stripped, warnings = validate_and_strip(data)
+        assert [c["id"] for c in stripped["controls"]] == ["4_2_3_1"]
+        assert [g["id"] for g in stripped["groups"]] == ["kyc"]
+        assert stripped["rules"] == [{"target": "kyc"}]
+        assert warnings == validate_output(data)
+        assert len(warnings) == 3
+
+    def test_non_string_ids_stripped(self):
+        data = {
+            "controls": [{"id": 4, "group": "kyc"}, {"id": "4_2_3_1", "group": ["kyc"]}, {"id": "4_2_3_2", "group": "kyc"}],
+            "groups": [{"id": "kyc", "variant": "main"}, {"id": 7, "variant": "main"}],
+            "rules": [{"target": 4}, {"target": "kyc", "scope": ["4_2"]}],
+        }
+        stripped, warnings = validate_and_strip(data)
+        assert [c["id"] for c in stripped["controls"]] == ["4_2_3_2"]
+        assert [g["id"] for g in stripped["groups"]] == ["kyc"]
+        assert stripped["rules"] == [{"target": "kyc", "scope": ["4_2"]}]
+        assert any("Invalid control ID: '4'" in w for w in warnings)
+        assert any("Invalid rule target: '4'" in w for w in warnings)
+
+    def test_duplicate_rules_stripped(self):
+        show = {"target": "kyc", "scope": "#/properties/4_2", "effect": "SHOW", "schema": {"const": "Yes"}}
+        hide = {**show, "effect": "HIDE"}
+        data = {"controls": [], "groups": [], "rules": [show, dict(show), hide]}
+        stripped, warnings = validate_and_strip(data)
+        assert stripped["rules"] == [show, hide]
+        assert any("Duplicate rule" in w for w in warnings)
+
+    def test_rule_target_accepts_control_ids_and_group_slugs(self):
+        assert is_valid_rule_target("4_2_3_1_a")
+        assert is_valid_rule_target("collection-kyc")
+        assert not is_valid_rule_target("4.2.3")
+        assert not is_valid_rule_target("")
+
+    def test_shape_check_accepts_well_formed_output(self):
+        data = {"controls": [{"id": "4_2_3_1"}], "groups": [], "rules": []}
+        assert check_output_shape(data) == []
+
+    def test_shape_check_rejects_malformed_output(self):
+        assert check_output_shape("[]") != []
+        errors = check_output_shape({"controls": "[{...}]", "groups": ["collection"], "rules": []})
+        assert any("'controls'" in e for e in errors)
+        assert any("'groups'" in e for e in errors)
+
     def test_control_missing_group(self):
         data = {"controls": [{"id": "4_2_3"}], "groups": [], "rules": []}
         warnings = validate_output(data)
@@ -156,22 +268,22 @@ class TestValidation:
     def test_id_regex_valid(self):
         valid = ["4_1", "4_2_3", "4_2_3_1", "4_2_3_1_a", "4_15_6"]
         for v in valid:
-            assert ID_REGEX.match(v), f"{v} should be valid"
+            assert ID_REGEX.fullmatch(v), f"{v} should be valid"
 
     def test_id_regex_invalid(self):
-        invalid = ["4", "3_1", "4.2.3", "4_a", "foo", "4_2_3_1_ab"]
+        invalid = ["4", "3_1", "4.2.3", "4_a", "foo", "4_2_3_1_ab", "4_2_3\n", "4_\u0663"]
         for v in invalid:
-            assert not ID_REGEX.match(v), f"{v} should be invalid"
+            assert not ID_REGEX.fullmatch(v), f"{v} should be invalid"
 
     def test_slug_regex_valid(self):
         valid = ["collection-kyc", "verification", "safe-harbour-listed", "a", "abc123"]
         for v in valid:
-            assert SLUG_REGEX.match(v), f"{v} should be a valid slug"
+            assert SLUG_REGEX.fullmatch(v), f"{v} should be a valid slug"
 
     def test_slug_regex_invalid(self):
-        invalid = ["4_2_3", "CamelCase", "-starts-with-dash", "has spaces", "4_3", ""]
+        invalid = ["4_2_3", "CamelCase", "-starts-with-dash", "has spaces", "4_3", "", "slug\n"]
         for v in invalid:
-            assert not SLUG_REGEX.match(v), f"{v} should be an invalid slug"
+            assert not SLUG_REGEX.fullmatch(v), f"{v} should be an invalid slug"
 
 
 # ---------------------------------------------------------------------------
@@ -314,7 +426,7 @@ class TestProcessForms:
     def test_gated_by_is_valid_id_or_none(self):
         for pid, form in PROCESS_FORMS.items():
             if form["gated_by"] is not None:
-                assert ID_REGEX.match(form["gated_by"]), \
+                assert ID_REGEX.fullmatch(form["gated_by"]), \
                     f"{pid} gated_by '{form['gated_by']}' is not a valid ID"
 
     def test_expected_form_count(self):
@@ -342,7 +454,7 @@ class TestProcessForms:
             for st in form["sub_types"]:
                 assert "id" in st, f"{pid} sub_type missing 'id'"
                 assert "label" in st, f"{pid} sub_type missing 'label'"
-                assert SLUG_REGEX.match(st["id"]), \
+                assert SLUG_REGEX.fullmatch(st["id"]), \
                     f"{pid} sub_type id '{st['id']}' is not a valid slug"
 
     def test_form_links_structure(self):
@@ -353,7 +465,7 @@ class TestProcessForms:
                 assert "target" in fl, f"{pid} form_link missing 'target'"
                 assert "label" in fl, f"{pid} form_link missing 'label'"
                 assert "gated_by" in fl, f"{pid} form_link missing 'gated_by'"
-                assert ID_REGEX.match(fl["gated_by"]), \
+                assert ID_REGEX.fullmatch(fl["gated_by"]), \
                     f"{pid} form_link gated_by '{fl['gated_by']}' is not a valid ID"
                 assert fl["target"] in PROCESS_FORMS, \
                     f"{pid} form_link target '{fl['target']}' is not a known form"
@@ -363,7 +475,7 @@ class TestProcessForms:
         for pid, form in PROCESS_FORMS.items():
             assert isinstance(form["subprocess_groups"], list), f"{pid} subprocess_groups not a list"
             for sg in form["subprocess_groups"]:
-                assert SLUG_REGEX.match(sg), \
+                assert SLUG_REGEX.fullmatch(sg), \
                     f"{pid} subprocess_group '{sg}' is not a valid slug"
 
     def test_architect_notes_are_string_lists(self):
@@ -400,7 +512,7 @@ class TestProcessForms:
 class TestGatherProcessNodes:
     @pytest.fixture
     def enriched_groups(self, sample_nodes, sample_groups):
-        return enrich_groups_with_nodes(sample_nodes, sample_groups)
+        return {g["id"]: g for g in enrich_groups_with_nodes(sample_nodes, sample_groups)}
 
     def test_gathers_nodes_from_source_group(self, enriched_groups):
         """gather_process_nodes should return all text nodes from the source group."""
@@ -412,8 +524,8 @@ class TestGatherProcessNodes:
 
     def test_unknown_source_group_returns_empty(self):
         """If source group not in enriched data, return empty list."""
-        groups = [{"id": "4_99", "text_nodes": [{"node_index": 0, "text": "x", "rule_code": "", "type": "TEXT", "is_bold": False, "is_italic": False}]}]
-        nodes = gather_process_nodes("cdd-individuals", groups)
+        group_map = {"4_99": {"id": "4_99", "text_nodes": [{"node_index": 0, "text": "x", "rule_code": "", "type": "TEXT", "is_bold": False, "is_italic": False}]}}
+        nodes = gather_process_nodes("cdd-individuals", group_map)
         # cdd-individuals uses 4_2 which is not in groups
         assert nodes == []
 
@@ -424,6 +536,25 @@ class TestGatherProcessNodes:
         indices = [n["node_index"] for n in nodes]
         assert indices == [8, 9]
 
+    def test_overlapping_source_groups_are_deduplicated(self, enriched_groups, monkeypatch):
+        """A node reachable through two source groups is gathered once, in first-seen order."""
+        overlapping = {"4_1": enriched_groups["4_1"], "4_1_dup": enriched_groups["4_1"], "4_2": enriched_groups["4_2"]}
+        monkeypatch.setitem(PROCESS_FORMS["risk-assessment"], "source_groups", ["4_1", "4_1_dup", "4_2"])
+        nodes = gather_process_nodes("risk-assessment", overlapping)
+        assert [n["node_index"] for n in nodes] == list(range(10))
+
+
+class TestModelRouting:
+    def test_routes_by_estimated_text_tokens(self):
+        short = [{"text": "x" * 40}] * 100  # many short nodes: ~1000 tokens
+        long = [{"text": "x" * 4000}] * 2   # few long nodes: ~2000 tokens
+        assert select_model(estimate_text_tokens(short), 1600) == MODEL_SMALL
+        assert select_model(estimate_text_tokens(long), 1600) == MODEL_LARGE
+
+    def test_threshold_is_inclusive(self):
+        assert select_model(1600, 1600) == MODEL_LARGE
+        assert select_model(1599, 1600) == MODEL_SMALL
+
 
 class TestProcessOutput:
     def test_process_output_with_source_rules(self):
@@ -473,6 +604,51 @@ class TestProcessOutput:
         # Sub-type IDs should appear
         assert "sub-individual" in msg
 
+    def test_user_message_static_block_precedes_dynamic(self):
+        """Form-definition content sits in the static block; regulatory text in the dynamic tail."""
+        form_def = PROCESS_FORMS["cdd-individuals"]
+        text_nodes = [
+            {"node_index": 0, "text": "Test node", "rule_code": "4.2.1", "is_bold": False, "is_italic": False},
+        ]
+        static = build_process_static_block("cdd-individuals")
+        dynamic = build_process_dynamic_block(form_def, text_nodes)
+        assert "4_1_4_1" in static
+        assert "sub-individual" in static
+        assert "Test node" not in static
+        assert "[4.2.1] Test node" in dynamic
+        assert build_process_user_message("cdd-individuals", form_def, text_nodes) == static + dynamic
+
+    def test_gating_rule_added_once(self):
+        """finalize_process_result prepends the form's gate unless the model already emitted it."""
+        form_def = PROCESS_FORMS["cdd-individuals"]
+        gate = {"target": "4_2", "scope": "4_1_4_1", "effect": "SHOW", "schema": {"const": "Yes"}}
+        result, _ = finalize_process_result("cdd-individuals", form_def, [], {"controls": [], "groups": [], "rules": []})
+        assert result["rules"] == [gate]
+        result, _ = finalize_process_result("cdd-individuals", form_def, [], {"controls": [], "groups": [], "rules": [gate]})
+        assert result["rules"] == [gate]
+
+    def test_parse_process_response_discards_truncated_output(self, fake_response):
+        """A response that stopped at max_tokens is dropped even if it holds a tool_use block."""
+        data = {"controls": [], "groups": [{"id": "collection-kyc", "title": "KYC", "variant": "main"}], "rules": []}
+        truncated = fake_response("output_section_data", data, stop_reason="max_tokens", output_tokens=8192)
+        complete = fake_response("output_section_data", data)
+        assert parse_process_response("cdd-individuals", truncated) is None
+        assert parse_process_response("cdd-individuals", complete) == data
+
+    def test_batch_isolates_a_failing_message(self, fake_response, monkeypatch):
+        """A message that fails to parse is reported as None without losing the others."""
+        data = {"controls": [], "groups": [{"id": "collection-kyc", "title": "KYC", "variant": "main"}], "rules": []}
+        broken = fake_response("output_section_data", data)
+        broken.content = None
+
+        async def fake_submit(client, requests, label):
+            return {"cdd-individuals": broken, "risk-assessment": fake_response("output_section_data", data)}
+
+        monkeypatch.setattr("architect.submit_message_batch", fake_submit)
+        jobs = [(pid, PROCESS_FORMS[pid], [], MODEL_SMALL, None) for pid in ("cdd-individuals", "risk-assessment")]
+        results = asyncio.run(call_process_architect_batch(None, jobs))
+        assert results == {"cdd-individuals": None, "risk-assessment": data}
+
 
 # ---------------------------------------------------------------------------
 # Coverage audit tests
@@ -599,6 +775,15 @@ class TestCoverageAudit:
 # ---------------------------------------------------------------------------
 
 class TestReviewTool:
+    @pytest.fixture
+    def reviewed_form(self):
+        """A one-control form, its coverage report and a review of it: (text_nodes, result, report, review)."""
+        text_nodes = [{"node_index": 0, "text": "Rule 1", "rule_code": "4.2.1", "is_bold": False, "is_italic": False}]
+        result = {"controls": [{"id": "4_2_1", "label": "Q?", "source-rules": ["4.2.1"], "mapping-confidence": 0.9}]}
+        report = compute_coverage_report("cdd-individuals", text_nodes, result)
+        review = {"reviews": [{"control_id": "4_2_1", "quality": "good", "confidence": 0.9}], "unmapped_assessment": []}
+        return text_nodes, result, report, review
+
     def test_review_tool_has_required_schema(self):
         assert REVIEW_TOOL["name"] == "output_review"
         schema = REVIEW_TOOL["input_schema"]
@@ -612,3 +797,223 @@ class TestReviewTool:
     def test_unmapped_reason_enum(self):
         unmapped_props = REVIEW_TOOL["input_schema"]["properties"]["unmapped_assessment"]["items"]["properties"]
         assert set(unmapped_props["reason"]["enum"]) == {"correctly_omitted", "should_be_mapped", "already_covered"}
+
+    def test_unmapped_rules_use_first_node_text(self):
+        text_nodes = [
+            {"node_index": 0, "text": "Heading", "rule_code": "4.2.3", "type": "RULE", "is_bold": True, "is_italic": False},
+            {"node_index": 1, "text": "Body", "rule_code": "4.2.3", "type": "RULE", "is_bold": False, "is_italic": False},
+        ]
+        report = {"unmapped_codes": ["4.2.3", "4.9.9"]}
+        request = build_review_request("cdd-individuals", {"controls": []}, text_nodes, report)
+        user_msg = request["messages"][0]["content"]
+        assert "  [4.2.3] Heading\n" in user_msg
+        assert "  [4.9.9] (text not found)\n" in user_msg
+
+    def test_review_budget_scales_with_items_up_to_ceiling(self):
+        report = {"unmapped_codes": ["4.2.2", "4.2.3"]}
+        request = build_review_request("cdd-individuals", {"controls": []}, [], report)
+        assert request["max_tokens"] == review_max_tokens(2)
+        assert review_max_tokens(0) < review_max_tokens(10) < review_max_tokens(20) < 4096
+        assert review_max_tokens(10_000) == REVIEW_MAX_TOKENS
+
+    def test_only_problematic_reviews_flagged_forms(self, reviewed_form):
+        """Clean forms are skipped before any output is loaded or API call made."""
+        _, _, clean, _ = reviewed_form
+        empty = compute_coverage_report("record-keeping", [], {"controls": []})
+        assert not needs_review(clean)
+        assert needs_review({**clean, "low_confidence": [{"id": "4_2_1"}]})
+
+        reviews = asyncio.run(run_review_pass(
+            None, "unused-run-dir", {}, {"cdd-individuals": clean, "record-keeping": empty}, only_problematic=True,
+        ))
+        assert reviews == {}
+
+    def test_cached_review_is_reused_without_an_api_call(self, tmp_path, reviewed_form):
+        text_nodes, result, report, review = reviewed_form
+        cache = ResponseCache(str(tmp_path))
+        cache.put(build_review_request("cdd-individuals", result, text_nodes, report), review)
+
+        reviews = asyncio.run(run_review_pass(
+            None, "unused-run-dir", {"cdd-individuals": text_nodes}, {"cdd-individuals": report},
+            {"cdd-individuals": result}, cache=cache,
+        ))
+        assert reviews == {"cdd-individuals": review}
+
+    def test_truncated_review_is_retried_at_full_budget(self, tmp_path, fake_response, fake_stream_client,
+                                                        reviewed_form):
+        text_nodes, result, report, review = reviewed_form
+        budgets = []
+
+        def respond(request):
+            budgets.append(request["max_tokens"])
+            stop = "max_tokens" if request["max_tokens"] < REVIEW_MAX_TOKENS else "tool_use"
+            return fake_response("output_review", review, stop_reason=stop)
+
+        client = fake_stream_client(respond)
+        cache = ResponseCache(str(tmp_path))
+        reviews = asyncio.run(run_review_pass(
+            client, "unused-run-dir", {"cdd-individuals": text_nodes}, {"cdd-individuals": report},
+            {"cdd-individuals": result}, cache=cache,
+        ))
+        assert reviews == {"cdd-individuals": review}
+        assert budgets == [review_max_tokens(1), REVIEW_MAX_TOKENS]
+        assert cache.get(build_review_request("cdd-individuals", result, text_nodes, report)) == review
+
+    def test_malformed_review_does_not_lose_the_others(self, fake_response, fake_stream_client, reviewed_form):
+        text_nodes, result, report, _ = reviewed_form
+        # One review is not a list of objects; the other omits fields the summary reads
+        sparse = {"reviews": [{"control_id": "4_2_1"}], "unmapped_assessment": [{"rule_code": "4.2.1"}]}
+
+        def respond(request):
+            if PROCESS_FORMS["record-keeping"]["title"] in request["messages"][0]["content"]:
+                return fake_response("output_review", sparse)
+            return fake_response("output_review", {"reviews": ["good"], "unmapped_assessment": []})
+
+        forms = ("cdd-individuals", "record-keeping")
+        reviews = asyncio.run(run_review_pass(
+            fake_stream_client(respond), "unused-run-dir", {pid: text_nodes for pid in forms},
+            {pid: report for pid in forms}, {pid: result for pid in forms},
+        ))
+        assert reviews == {"record-keeping": sparse}
+
+    def test_malformed_batch_review_does_not_lose_the_others(self, fake_response, reviewed_form, monkeypatch):
+        text_nodes, result, report, review = reviewed_form
+        broken = fake_response("output_review", review)
+        broken.content = None
+
+        async def fake_submit(client, requests, label):
+            return {"cdd-individuals": broken, "record-keeping": fake_response("output_review", review)}
+
+        monkeypatch.setattr("architect.submit_message_batch", fake_submit)
+        forms = ("cdd-individuals", "record-keeping")
+        reviews = asyncio.run(run_review_pass(
+            None, "unused-run-dir", {pid: text_nodes for pid in forms},
+            {pid: report for pid in forms}, {pid: result for pid in forms}, batch=True,
+        ))
+        assert reviews == {"record-keeping": review}
+
+
+# ---------------------------------------------------------------------------
+# Checkpoint / resume tests
+# ---------------------------------------------------------------------------
+
+class TestCheckpointing:
+    def test_write_json_atomic_round_trips_and_leaves_no_temp_files(self, tmp_path):
+        path = tmp_path / "out.json"
+        write_json_atomic(str(path), {"controls": [1, 2]})
+        write_json_atomic(str(path), {"controls": [3]})
+        assert json.loads(path.read_text()) == {"controls": [3]}
+        assert [p.name for p in tmp_path.iterdir()] == ["out.json"]
+
+    def test_write_json_atomic_leaves_output_world_readable(self, tmp_path):
+        path = tmp_path / "out.json"
+        write_json_atomic(str(path), {})
+        assert stat.S_IMODE(path.stat().st_mode) == 0o644
+
+    def test_dumps_json_matches_stdlib_semantics(self):
+        data = {"label": "Verify the customer’s identity", "mapping-confidence": 0.85, "rules": []}
+        assert json.loads(dumps_json(data)) == data
+
+    def test_load_json_reads_what_write_json_atomic_wrote(self, tmp_path):
+        data = {"label": "Verify the customer’s identity", "mapping-confidence": 0.85}
+        path = str(tmp_path / "out.json")
+        write_json_atomic(path, data)
+        assert load_json(path) == data
+
+    def test_missing_output_is_not_current(self, tmp_path):
+        assert not is_output_current(str(tmp_path / "missing.json"), [])
+
+    def test_output_newer_than_inputs_is_current(self, tmp_path):
+        src, out = tmp_path / "in.json", tmp_path / "out.json"
+        src.write_text("{}")
+        out.write_text("{}")
+        os.utime(src, (1000, 1000))
+        os.utime(out, (2000, 2000))
+        assert is_output_current(str(out), [str(src), str(tmp_path / "no-feedback.json")])
+        os.utime(src, (3000, 3000))
+        assert not is_output_current(str(out), [str(src)])
+
+    def test_response_cache_hits_only_for_identical_requests(self, tmp_path):
+        cache = ResponseCache(str(tmp_path / "cache"))
+        request = {"model": MODEL_SMALL, "messages": [{"role": "user", "content": "x"}]}
+        assert cache.get(request) is None
+        cache.put(request, {"controls": [], "groups": [], "rules": []})
+        assert cache.get(dict(reversed(request.items()))) == {"controls": [], "groups": [], "rules": []}
+        assert cache.get({**request, "model": MODEL_LARGE}) is None
+        assert ResponseCache(str(tmp_path / "cache"), refresh=True).get(request) is None
+
+    def test_response_cache_treats_corrupt_entry_as_miss(self, tmp_path):
+        cache = ResponseCache(str(tmp_path))
+        request = {"model": MODEL_SMALL}
+        with open(cache.path(request), "w") as f:
+            f.write("{truncated")
+        assert cache.get(request) is None
+
+
+# ---------------------------------------------------------------------------
+# Rate limiter tests
+# ---------------------------------------------------------------------------
+
+class TestRateLimiter:
+    def test_burst_up_to_capacity_then_waits_for_refill(self):
+        async def run():
+            limiter = TokenBucket(600)  # 10 units per second
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            for _ in range(600):
+                await limiter.acquire()
+            burst = loop.time() - start
+            await limiter.acquire()
+            return burst, loop.time() - start
+
+        burst, total = asyncio.run(run())
+        assert burst < 0.05
+        assert total >= 0.09
+
+    def test_waiter_completes_when_capacity_shrinks(self):
+        async def run():
+            bucket = TokenBucket(60_000)  # 1000 units per second
+            await bucket.acquire(59_950)
+            waiter = asyncio.create_task(bucket.acquire(100))
+            await asyncio.sleep(0)  # let the waiter start sleeping for refill
+            bucket.adjust(40, None)  # now below the amount the waiter asked for
+            await asyncio.wait_for(waiter, timeout=1.0)
+
+        asyncio.run(run())
+
+    def test_estimate_input_tokens_scales_with_prompt_size(self):
+        small = {"system": "s", "messages": [{"role": "user", "content": "x" * 400}]}
+        large = {"system": "s", "messages": [{"role": "user", "content": "x" * 4000}]}
+        assert 100 <= estimate_input_tokens(small) < estimate_input_tokens(large)
+        assert estimate_input_tokens(large) >= 1000
+
+    def test_update_follows_rate_limit_headers(self):
+        limiter = RateLimiter(50, 400_000)
+        limiter.update({
+            "anthropic-ratelimit-requests-limit": "4000",
+            "anthropic-ratelimit-requests-remaining": "12",
+            "anthropic-ratelimit-input-tokens-limit": "2000000",
+        })
+        assert limiter.requests.capacity == 4000
+        assert limiter.requests._tokens == 12
+        assert limiter.tokens.capacity == 2_000_000
+        assert limiter.tokens._tokens == 400_000
+
+    def test_update_ignores_missing_or_malformed_headers(self):
+        limiter = RateLimiter(50, 400_000)
+        limiter.update({"anthropic-ratelimit-requests-limit": "n/a"})
+        assert (limiter.requests.capacity, limiter.requests._tokens) == (50, 50)
+        assert (limiter.tokens.capacity, limiter.tokens._tokens) == (400_000, 400_000)
+
+
+# ---------------------------------------------------------------------------
+# Token usage tests
+# ---------------------------------------------------------------------------
+
+class TestUsageTotals:
+    def test_log_usage_accumulates_across_calls(self, fake_response):
+        totals = Counter()
+        usage = fake_response("output_section_data", {}, output_tokens=50, cache_read_input_tokens=4000).usage
+        log_usage("a", usage, totals)
+        log_usage("b", usage, totals)
+        assert totals == Counter(calls=2, input=200, cache_read=8000, output=100)